@@ -3,36 +3,105 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+import asyncio
+import itertools
 import json
 import os
 import queue
 import re
 import requests
+import shlex
 import socket
 import subprocess
 import signal
 import sys
 import threading
 import time
-from typing import Any, Dict, List, IO, Mapping, Optional, Union
+from typing import Any, Dict, List, IO, Iterator, Mapping, Optional, Sequence, Tuple, Union
 
 from . import netstring
 
+# orjson is considerably faster than the standard library's json module, but
+# it is optional. It also cannot represent integers wider than 64 bits: it
+# refuses to encode them and silently decodes them as floats, so such messages
+# are handled by the json module instead.
+try:
+    import orjson
+except ImportError:
+    orjson = None # type: ignore
+
+# Any run of 19 or more digits might be an integer that does not fit in 64 bits
+_LONG_DIGITS = re.compile(b'[0-9]{19}')
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` as a UTF-8 encoded JSON bytestring."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode()
+
+def _json_loads(message: Union[str, bytes]) -> Any:
+    """Parse a JSON message, given either as a string or as UTF-8 bytes."""
+    if isinstance(message, str):
+        message = message.encode()
+    if orjson is not None and _LONG_DIGITS.search(message) is None:
+        return orjson.loads(message)
+    return json.loads(message)
+
+# Matches the start of a reply whose ID comes before any other nested data,
+# so that the reply can be filed under its ID without being parsed
+_REPLY_ID = re.compile(rb'\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*([0-9]+)\s*[,}]')
+
+# The serialized start of a request, up to its ID, for each method
+_request_prefixes: Dict[str, bytes] = {}
+
+def _encode_request(method: str, request_id: int, params: dict) -> bytes:
+    """Serialize a JSONRPC request. Everything before the request ID depends
+       only on the method, so it is serialized once per method and reused.
+    """
+    prefix = _request_prefixes.get(method)
+    if prefix is None:
+        prefix = b'{"jsonrpc":"2.0","method":' + _json_dumps(method) + b',"id":'
+        _request_prefixes[method] = prefix
+    return b'%s%d,"params":%s}' % (prefix, request_id, _json_dumps(params))
+
+def _split_reply(reply_bytes: Union[str, bytes]) -> Tuple[Any, Any]:
+    """Return the ID of a reply together with the reply itself. If the ID can
+       be read off the start of the reply, the reply is left unparsed, as
+       bytes; otherwise it is parsed into JSON.
+    """
+    match = _REPLY_ID.match(reply_bytes) if isinstance(reply_bytes, bytes) else None
+    if match is not None:
+        return (int(match.group(1)), reply_bytes)
+    else:
+        the_reply = _json_loads(reply_bytes)
+        return (the_reply['id'], the_reply)
+
+# How many bytes to ask for with each read from a socket, which is also the
+# size of the scratch buffer that socket processes read into
+RECV_CHUNK = 1 << 16
+
+# How many bytes of already decoded replies a socket process may keep at the
+# front of its buffer before it discards them
+COMPACT_THRESHOLD = 1 << 20
 
 
 # Must be boxed separately to enable sharing of connections
 class IDSource:  # pylint: disable=too-few-public-methods
     """A source of unique identifiers for JSON RPC requests."""
 
-    next_id: int
+    _ids: Iterator[int]
 
     def __init__(self) -> None:
-        self.next_id = 0
+        self._ids = itertools.count(1)
 
     def get(self) -> int:
-        """Get a unique (for this instance) number."""
-        self.next_id += 1
-        return self.next_id
+        """Get a unique (for this instance) number. This is safe to call from
+           several threads at once.
+        """
+        return next(self._ids)
 
 
 class ServerProcess(metaclass=ABCMeta):
@@ -46,12 +115,17 @@ class ServerProcess(metaclass=ABCMeta):
        1. Implement ``setup`` to launch a process, create a socket, or
           whatever else is necessary to communicate with the server.
 
-       2. Implement ``get_one_reply``, so that it returns a string
-          that contains a JSON message if one is available, or ``None``
-          if not.
+       2. Implement ``get_one_reply``, so that it returns a string or
+          bytestring that contains a JSON message if one is available,
+          or ``None`` if not.
+
+       3. Implement ``send_one_message``, which sends a string or
+          UTF-8 bytestring that contains a serialized JSON message to
+          the process.
 
-       3. Implement ``send_one_message``, which sends a string that
-          contains a serialized JSON message to the process.
+       Subclasses that can block until the server sends something
+       should also override ``wait_for_one_reply``, whose default
+       implementation repeatedly polls ``get_one_reply``.
     """
 
 
@@ -66,10 +140,24 @@ class ServerProcess(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def get_one_reply(self) -> Optional[str]: pass
+    def get_one_reply(self) -> Optional[Union[str, bytes]]: pass
+
+    def wait_for_one_reply(self) -> Union[str, bytes]:
+        """Block until a reply is available, and return it."""
+        reply = self.get_one_reply()
+        while reply is None:
+            reply = self.get_one_reply()
+        return reply
 
     @abstractmethod
-    def send_one_message(self, the_message: str, *, expecting_response : bool = True) -> None: pass
+    def send_one_message(self, the_message: Union[str, bytes], *, expecting_response : bool = True) -> None: pass
+
+    def send_messages(self, messages: Sequence[Union[str, bytes]]) -> None:
+        """Send several messages, each of which expects a response. Subclasses
+           may override this to send them all at once.
+        """
+        for message in messages:
+            self.send_one_message(message)
 
 class ManagedProcess(ServerProcess, metaclass=ABCMeta):
     """A ``ServerProcess`` that is responsible for starting and stopping
@@ -78,12 +166,15 @@ class ManagedProcess(ServerProcess, metaclass=ABCMeta):
     buf: bytearray
     proc: Optional[subprocess.Popen]
 
-    def __init__(self, command: str, *,
+    def __init__(self, command: Union[str, Sequence[str]], *,
                  environment: Optional[Union[Mapping[bytes, Union[bytes, str]],
                                              Mapping[str, Union[bytes, str]]]]=None):
         """ Construct a managed process by executing the given command.
 
-            :param command: The command to be executed in :func:`setup`.
+            :param command: The command to be executed in :func:`setup`,
+              either as a list of arguments or as a string that is split
+              into arguments using shell-like syntax (see
+              :func:`shlex.split`). No shell is run.
             :param environment: A process environment to be used instead of the default.
         """
         self.command = command
@@ -93,6 +184,13 @@ class ManagedProcess(ServerProcess, metaclass=ABCMeta):
 
         super().__init__()
 
+    def command_arguments(self) -> List[str]:
+        """Return the command to be executed, as a list of arguments."""
+        if isinstance(self.command, str):
+            return shlex.split(self.command)
+        else:
+            return list(self.command)
+
     def pid(self) -> Optional[int]:
         """Return the process group id of the managed server process."""
         if self.proc is not None:
@@ -115,20 +213,103 @@ class ManagedProcess(ServerProcess, metaclass=ABCMeta):
                 pass
 
 
-class SocketProcess(ManagedProcess):
+class BufferedSocketProcess(ServerProcess, metaclass=ABCMeta):
+    """A ``ServerProcess`` that exchanges netstrings with the server over
+    ``self.socket``, which subclasses should connect in ``setup``. Replies
+    are read into an internal buffer, from which they are decoded.
+    """
+    buf: bytearray
+    buf_pos: int
+    scratch_view: memoryview
+    socket: socket.socket
+
+    def __init__(self) -> None:
+        self.buf = bytearray(b'')
+        self.buf_pos = 0
+        self.scratch_view = memoryview(bytearray(RECV_CHUNK))
+        super().__init__()
+
+    def _connect_tcp(self, family: int, address: Tuple[Any, ...]) -> None:
+        """Connect ``self.socket`` to the server at ``address`` over TCP."""
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        # Requests are small and each one waits for its reply, so don't
+        # let Nagle's algorithm hold them back
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def buffer_replies(self) -> None:
+        """Read any replies that the server has sent, and add their byte
+           representation to the internal buffer, freeing up space in
+           the pipe or socket. This does not block.
+        """
+        self.socket.setblocking(False)
+        try:
+            while True:
+                n = self.socket.recv_into(self.scratch_view)
+                self.buf += self.scratch_view[:n]
+                if n == 0:
+                    return None
+        except BlockingIOError:
+            return None
+        finally:
+            self.socket.setblocking(True)
+
+    def _receive(self) -> bool:
+        """Block until the server sends something, and add it to the internal
+           buffer. Return ``False`` if the server closed the connection.
+        """
+        n = self.socket.recv_into(self.scratch_view)
+        self.buf += self.scratch_view[:n]
+        return n > 0
+
+    def get_one_reply(self) -> Optional[bytes]:
+        """If a complete reply has been buffered, parse it from the buffer and
+           return it as a bytestring."""
+        self.buffer_replies()
+        if self.buf_pos == len(self.buf):
+            return None
+        try:
+            (msg, self.buf_pos) = netstring.decode_at(self.buf, self.buf_pos)
+        except netstring.Incomplete:
+            return None
+        if self.buf_pos == len(self.buf) or self.buf_pos > COMPACT_THRESHOLD:
+            del self.buf[:self.buf_pos]
+            self.buf_pos = 0
+        return msg
+
+    def wait_for_one_reply(self) -> bytes:
+        """Block until a complete reply has arrived, and return it."""
+        reply = self.get_one_reply()
+        while reply is None:
+            if not self._receive():
+                raise ConnectionError("The server closed the connection")
+            reply = self.get_one_reply()
+        return reply
+
+    def send_one_message(self, message: Union[str, bytes], *, expecting_response : bool = True) -> None:
+        msg_bytes = netstring.encode(message)
+        self.socket.sendall(msg_bytes)
+
+    def send_messages(self, messages: Sequence[Union[str, bytes]]) -> None:
+        self.socket.sendall(b''.join([netstring.encode(m) for m in messages]))
+
+
+class SocketProcess(ManagedProcess, BufferedSocketProcess):
     """A ``ServerProcess`` whose process communicates over a socket.
     """
     port: Optional[int]
-    socket: socket.socket
+    socket_path: Optional[str]
     environment_override: Optional[Union[Mapping[bytes, Union[bytes, str]],
                                          Mapping[str, Union[bytes, str]]]]
 
-    def __init__(self, command: str, *,
+    def __init__(self, command: Union[str, Sequence[str]], *,
                  persist: bool=False,
                  environment: Optional[Union[Mapping[bytes, Union[bytes, str]],
                                              Mapping[str, Union[bytes, str]]]]=None):
-        """:param command: The command to be executed, using a shell,
-             to start the server.
+        """:param command: The command to be executed to start the
+             server, either as a list of arguments or as a string that
+             is split into arguments using shell-like syntax (see
+             :func:`shlex.split`). No shell is run.
 
            :param persist: Whether to allow the subprocess to survive
              the Python process. If this is ``False``, the subprocess is
@@ -139,38 +320,10 @@ class SocketProcess(ManagedProcess):
              used).
         """
         self.persist = persist
+        self.port = None
+        self.socket_path = None
         super().__init__(command, environment=environment)
 
-
-    def buffer_replies(self) -> None:
-        """Read any replies that the server has sent, and add their byte
-           representation to the internal buffer, freeing up space in
-           the pipe or socket.
-        """
-        try:
-            arrived = self.socket.recv(4096)
-            while arrived != b'':
-                self.buf.extend(arrived)
-                arrived = self.socket.recv(4096)
-            return None
-        except BlockingIOError:
-            return None
-
-    def get_one_reply(self) -> Optional[str]:
-        """If a complete reply has been buffered, parse it from the buffer and
-           return it as a bytestring."""
-        self.buffer_replies()
-        try:
-            (msg, rest) = netstring.decode(self.buf)
-            self.buf = bytearray(rest)
-            return msg
-        except (ValueError, IndexError):
-            return None
-
-    def send_one_message(self, message: str, expecting_response : bool = True) -> None:
-        msg_bytes = netstring.encode(message)
-        self.socket.send(msg_bytes)
-
     def __del__(self) -> None:
         if self.proc is not None:
             if not self.persist:
@@ -185,6 +338,10 @@ class DynamicSocketProcess(SocketProcess):
     """A ``SocketServerProcess`` whose process communicates over a socket
     on a port chosen arbitrarily by the process itself. This port
     should be written to ``stdout`` after the literal string ``PORT``.
+
+    Alternatively, a server may listen on a Unix domain socket, which
+    avoids the overhead of TCP. It should then write the socket's path
+    to ``stdout`` after the literal string ``SOCKET``.
     """
 
     def setup(self) -> None:
@@ -193,38 +350,38 @@ class DynamicSocketProcess(SocketProcess):
             # To debug, consider setting stderr to sys.stdout instead (to see
             # server log messages).
             self.proc = subprocess.Popen(
-                self.command,
-                shell=True,
+                self.command_arguments(),
                 stdout=subprocess.PIPE,
                 # stderr=sys.stdout,
                 stderr=subprocess.DEVNULL,
                 env=self.environment_override,
-                start_new_session=True,
-                universal_newlines=True)
+                start_new_session=True)
 
             if self.proc.stdout is None:
                 raise ValueError("Server process has no stdout")
             out_line = self.proc.stdout.readline()
-            match = re.match(r'PORT (\d+)', out_line)
-            if match:
-                self.port = int(match.group(1))
+            if out_line.startswith(b'PORT '):
+                self.port = int(out_line[5:])
+            elif out_line.startswith(b'SOCKET '):
+                self.socket_path = os.fsdecode(out_line[7:].rstrip(b'\r\n'))
             else:
                 raise Exception("Failed to load process, output was `" +
-                                out_line + "' but expected PORT then a port.")
+                                out_line.decode(errors='replace') +
+                                "' but expected PORT then a port, or SOCKET then a path.")
 
-        self.socket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
-        self.socket.connect(("localhost", self.port))
-        self.socket.setblocking(False)
+        if self.socket_path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(self.socket_path)
+        else:
+            self._connect_tcp(socket.AF_INET6, ("localhost", self.port))
 
 
 
 
-class RemoteSocketProcess(ServerProcess):
+class RemoteSocketProcess(BufferedSocketProcess):
     """A ``ServerProcess`` whose process communicates over a socket
     on a given port.
     """
-    buf: bytearray
-    socket: socket.socket
     ipv6: bool
 
     def __init__(self, host: str, port: int, ipv6: bool=True):
@@ -236,44 +393,13 @@ class RemoteSocketProcess(ServerProcess):
         self.host = host
         self.port = port
         self.ipv6 = ipv6
-        self.buf = bytearray(b'')
         super().__init__()
 
     def setup(self) -> None:
         super().setup()
 
-        self.socket = socket.socket(socket.AF_INET6 if self.ipv6 else socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((self.host, self.port))
-        self.socket.setblocking(False)
-
-    def buffer_replies(self) -> None:
-        """Read any replies that the server has sent, and add their byte
-           representation to the internal buffer, freeing up space in
-           the pipe or socket.
-        """
-        try:
-            arrived = self.socket.recv(4096)
-            while arrived != b'':
-                self.buf.extend(arrived)
-                arrived = self.socket.recv(4096)
-            return None
-        except BlockingIOError:
-            return None
-
-    def get_one_reply(self) -> Optional[str]:
-        """If a complete reply has been buffered, parse it from the buffer and
-           return it as a bytestring."""
-        self.buffer_replies()
-        try:
-            (msg, rest) = netstring.decode(self.buf)
-            self.buf = bytearray(rest)
-            return msg
-        except (ValueError, IndexError):
-            return None
-
-    def send_one_message(self, message: str, *, expecting_response : bool = True) -> None:
-        msg_bytes = netstring.encode(message)
-        self.socket.send(msg_bytes)
+        self._connect_tcp(socket.AF_INET6 if self.ipv6 else socket.AF_INET,
+                          (self.host, self.port))
 
 
 class HttpProcess(ServerProcess):
@@ -282,7 +408,7 @@ class HttpProcess(ServerProcess):
     buf: bytearray
     socket: socket.socket
     ipv6: bool
-    waiting_replies: List[str]
+    waiting_replies: List[bytes]
 
     def __init__(self, url: str):
         """
@@ -297,22 +423,22 @@ class HttpProcess(ServerProcess):
     def setup(self) -> None:
         pass
 
-    def get_one_reply(self) -> Optional[str]:
+    def get_one_reply(self) -> Optional[bytes]:
         if len(self.waiting_replies) == 0:
             return None
         else:
             return self.waiting_replies.pop()
 
-    def send_one_message(self, message: str, *, expecting_response : bool = True) -> None:
+    def send_one_message(self, message: Union[str, bytes], *, expecting_response : bool = True) -> None:
         r = requests.post(self.url,
                           headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
-                          data=message).text
+                          data=message).content
         if expecting_response:
             self.waiting_replies.append(r)
 
 
 
-def enqueue_netstring(out: IO[bytes], queue: queue.Queue[str]) -> None:
+def enqueue_netstring(out: IO[bytes], queue: queue.Queue[bytes]) -> None:
     while True:
         length_bytes = bytearray(b'')
         b = out.read(1)
@@ -320,7 +446,7 @@ def enqueue_netstring(out: IO[bytes], queue: queue.Queue[str]) -> None:
             length_bytes.append(b[0])
             b = out.read(1)
         length = int(length_bytes.decode())
-        message = out.read(length).decode()
+        message = out.read(length)
         queue.put(message)
         out.read(1) # comma
 
@@ -328,7 +454,7 @@ class StdIOProcess(ManagedProcess):
     """A ``SocketServerProcess`` whose process communicates over ``stdin``
     and ``stdout``.
     """
-    __messages: queue.Queue[str] # multiprocessing.Queue[str] #
+    __messages: queue.Queue[bytes] # multiprocessing.Queue[bytes] #
     __proc_thread: threading.Thread #multiprocessing.Process #
 
     def setup(self) -> None:
@@ -337,8 +463,7 @@ class StdIOProcess(ManagedProcess):
             # To debug, consider setting stderr to sys.stdout instead (to see
             # server log messages).
             self.proc = subprocess.Popen(
-                self.command,
-                shell=True,
+                self.command_arguments(),
                 text=False,
                 stdout=subprocess.PIPE,
                 stdin=subprocess.PIPE,
@@ -358,21 +483,32 @@ class StdIOProcess(ManagedProcess):
             self.proc_thread.daemon = True
             self.proc_thread.start()
 
-    def send_one_message(self, the_message: str, *, expecting_response : bool = True) -> None:
+    def send_one_message(self, the_message: Union[str, bytes], *, expecting_response : bool = True) -> None:
         if self.proc is not None and self.proc.stdin is not None:
             self.proc.stdin.write(netstring.encode(the_message))
             self.proc.stdin.flush()
         else:
             raise TypeError("Not a process, or no stdin")
 
-    def get_one_reply(self) -> Optional[str]:
+    def send_messages(self, messages: Sequence[Union[str, bytes]]) -> None:
+        if self.proc is not None and self.proc.stdin is not None:
+            self.proc.stdin.write(b''.join([netstring.encode(m) for m in messages]))
+            self.proc.stdin.flush()
+        else:
+            raise TypeError("Not a process, or no stdin")
+
+    def get_one_reply(self) -> Optional[bytes]:
         """If a complete reply has been buffered, parse it from the buffer and
            return it as a bytestring."""
         try:
-            return self.__messages.get(timeout=0.1)
+            return self.__messages.get_nowait()
         except queue.Empty:
             return None
 
+    def wait_for_one_reply(self) -> bytes:
+        """Block until a complete reply has arrived, and return it."""
+        return self.__messages.get()
+
 
 
 class ServerConnection:
@@ -385,6 +521,9 @@ class ServerConnection:
        of unique request IDs and a mapping from these IDs to the
        answer received (if any). Furthermore, it has a means of
        sending messages to the server.
+
+       Answers that have not yet been waited for may still be stored
+       as the unparsed bytes of the reply.
     """
     replies: Dict[int, Any]
 
@@ -406,10 +545,17 @@ class ServerConnection:
         """
         reply_bytes = self.process.get_one_reply()
         while reply_bytes is not None:
-            the_reply = json.loads(reply_bytes)
-            self.replies[the_reply['id']] = the_reply
+            self._add_reply(reply_bytes)
             reply_bytes = self.process.get_one_reply()
 
+    def _add_reply(self, reply_bytes: Union[str, bytes]) -> None:
+        """Add a reply to the internal collection of replies. If its ID can be
+           read off the start of the reply, parsing it into JSON is put off
+           until it is waited for.
+        """
+        (reply_id, the_reply) = _split_reply(reply_bytes)
+        self.replies[reply_id] = the_reply
+
     def send_command(self, method: str, params: dict) -> int:
         """Send a message to the server with the given JSONRPC command
            method and parameters. The return value is the unique request
@@ -417,14 +563,20 @@ class ServerConnection:
            replies.
         """
         request_id = self.get_id()
-        msg = {'jsonrpc': '2.0',
-               'method': method,
-               'id': request_id,
-               'params': params}
-        msg_string = json.dumps(msg)
-        self.process.send_one_message(msg_string)
+        self.process.send_one_message(_encode_request(method, request_id, params))
         return request_id
 
+    def send_commands(self, commands: Sequence[Tuple[str, dict]]) -> List[int]:
+        """Send several JSONRPC commands, given as pairs of a method and its
+           parameters, to the server at once. The return value is the list
+           of their unique request IDs, in the same order.
+        """
+        request_ids = [self.get_id() for _ in commands]
+        self.process.send_messages([_encode_request(method, request_id, params)
+                                    for ((method, params), request_id)
+                                    in zip(commands, request_ids)])
+        return request_ids
+
     def send_query(self, method: str, params: dict) -> int:
         """Send a message to the server with the given JSONRPC query
            method and parameters. The return value is the unique request
@@ -441,14 +593,212 @@ class ServerConnection:
         msg = {'jsonrpc': '2.0',
                'method': method,
                'params': params}
-        msg_string = json.dumps(msg)
-        self.process.send_one_message(msg_string, expecting_response = False)
+        self.process.send_one_message(_json_dumps(msg), expecting_response = False)
 
     def wait_for_reply_to(self, request_id: int) -> Any:
         """Block until a reply is received for the given
            ``request_id``. Return the reply."""
         self._process_replies()
         while request_id not in self.replies:
-            self._process_replies()
+            self._add_reply(self.process.wait_for_one_reply())
+
+        reply = self.replies[request_id]
+        if isinstance(reply, bytes):
+            reply = self.replies[request_id] = _json_loads(reply)
+        return reply #self.replies.pop(request_id)  # delete reply while returning it
+
+
+class QueuedServerConnection(ServerConnection):
+    """A ``QueuedServerConnection`` shares the process, request IDs and
+       replies of another ``ServerConnection``, but queues the commands
+       sent through it until :py:meth:`flush` is called, and then writes
+       them to the server together. Commands sent through the other
+       connection are sent right away as usual.
+
+       Waiting for a reply flushes the queue first, since the reply may
+       depend on a queued command. Commands sent after that are queued
+       again.
+    """
+    queued: List[bytes]
+
+    def __init__(self, connection: ServerConnection) -> None:
+        """:param connection: The connection whose process, request IDs
+             and replies are shared."""
+        self.process = connection.process
+        self.replies = connection.replies
+        self.ids = connection.ids
+        self.queued = []
+
+    def send_command(self, method: str, params: dict) -> int:
+        """Queue a message to the server with the given JSONRPC command
+           method and parameters. The return value is the unique request
+           ID that was used for the message, which can be used to find
+           replies.
+        """
+        request_id = self.get_id()
+        self.queued.append(_encode_request(method, request_id, params))
+        return request_id
 
-        return self.replies[request_id] #self.replies.pop(request_id)  # delete reply while returning it
+    def flush(self) -> None:
+        """Send all queued commands to the server at once."""
+        queued = self.queued
+        self.queued = []
+        if queued:
+            self.process.send_messages(queued)
+
+    def discard(self) -> None:
+        """Drop all queued commands without sending them. No replies will
+           arrive for them.
+        """
+        self.queued = []
+
+    def send_commands(self, commands: Sequence[Tuple[str, dict]]) -> List[int]:
+        self.flush()
+        return super().send_commands(commands)
+
+    def send_notification(self, method: str, params: dict) -> None:
+        self.flush()
+        super().send_notification(method, params)
+
+    def wait_for_reply_to(self, request_id: int) -> Any:
+        self.flush()
+        return super().wait_for_reply_to(request_id)
+
+
+class AsyncServerConnection:
+    """An ``AsyncServerConnection`` is an :mod:`asyncio` counterpart to
+       :py:class:`ServerConnection` for servers that are reached over a
+       socket. A background task reads replies as they arrive and hands
+       each one to whoever awaits it, so several independent requests
+       can be in flight on one connection at once, for instance with
+       ``asyncio.gather``.
+
+       Use :py:meth:`AsyncServerConnection.open` or
+       :py:meth:`AsyncServerConnection.open_unix` to create one. Argo
+       socket servers accept several connections, so this can be used
+       alongside a :py:class:`DynamicSocketProcess` by opening a
+       connection to its ``port`` or ``socket_path``.
+    """
+    replies: Dict[int, asyncio.Future[Any]]
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Create a connection from an open stream. This must be called
+           while an event loop is running.
+        """
+        self.reader = reader
+        self.writer = writer
+
+        self.replies = {}
+        self.ids = IDSource()
+        self.reader_task = asyncio.ensure_future(self._read_replies())
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> AsyncServerConnection:
+        """Connect to the server listening at ``host`` on ``port``."""
+        (reader, writer) = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @classmethod
+    async def open_unix(cls, path: str) -> AsyncServerConnection:
+        """Connect to the server listening on the Unix domain socket at
+           ``path``."""
+        (reader, writer) = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def close(self) -> None:
+        """Stop reading replies and close the connection. Requests that are
+           still waiting for a reply fail with a ``ConnectionError``.
+        """
+        self.reader_task.cancel()
+        try:
+            await self.reader_task
+        except asyncio.CancelledError:
+            pass
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    def get_id(self) -> int:
+        """Return a fresh request ID that has not previously been used with
+           this connection."""
+        return self.ids.get()
+
+    def _reply_future(self, request_id: int) -> asyncio.Future[Any]:
+        future = self.replies.get(request_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.replies[request_id] = future
+        if self.reader_task.done() and not future.done():
+            future.set_exception(ConnectionError("The connection to the server is closed"))
+        return future
+
+    async def _read_replies(self) -> None:
+        """Read replies until the connection is closed, resolving the futures
+           of the requests that they answer. When it stops, for whatever
+           reason, requests that are still waiting fail.
+        """
+        reason = "the connection was closed"
+        try:
+            while True:
+                length_bytes = (await self.reader.readuntil(b':'))[:-1]
+                if not length_bytes.isdigit():
+                    raise ValueError("Malformed netstring, missing :")
+                message = await self.reader.readexactly(int(length_bytes) + 1)
+                if message[-1:] != b',':
+                    raise ValueError("Malformed netstring, missing ,")
+                (reply_id, the_reply) = _split_reply(message[:-1])
+                if isinstance(reply_id, int):
+                    future = self._reply_future(reply_id)
+                    if not future.done():
+                        future.set_result(the_reply)
+        except Exception as exn:
+            reason = repr(exn)
+        finally:
+            for future in self.replies.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("No reply from the server: " + reason))
+
+    async def send_command(self, method: str, params: dict) -> int:
+        """Send a message to the server with the given JSONRPC command
+           method and parameters. The return value is the unique request
+           ID that was used for the message, which can be used to find
+           replies.
+        """
+        request_id = self.get_id()
+        self._reply_future(request_id)
+        self.writer.write(netstring.encode(_encode_request(method, request_id, params)))
+        await self.writer.drain()
+        return request_id
+
+    async def send_query(self, method: str, params: dict) -> int:
+        """Send a message to the server with the given JSONRPC query
+           method and parameters. The return value is the unique request
+           ID that was used for the message, which can be used to find
+           replies.
+        """
+        return await self.send_command(method, params)
+
+    async def send_notification(self, method: str, params: dict) -> None:
+        """Send a message to the server with the given JSONRPC notification
+           method and parameters. There is no return value, since notifications
+           do not allow for a response from the server.
+        """
+        msg = {'jsonrpc': '2.0',
+               'method': method,
+               'params': params}
+        self.writer.write(netstring.encode(_json_dumps(msg)))
+        await self.writer.drain()
+
+    async def wait_for_reply_to(self, request_id: int) -> Any:
+        """Wait until a reply is received for the given ``request_id``.
+           Return the reply."""
+        reply = await self._reply_future(request_id)
+        if isinstance(reply, bytes):
+            reply = _json_loads(reply)
+            parsed = asyncio.get_running_loop().create_future()
+            parsed.set_result(reply)
+            self.replies[request_id] = parsed
+        return reply
+
+    async def call(self, method: str, params: dict) -> Any:
+        """Send a command to the server and wait for its reply."""
+        return await self.wait_for_reply_to(await self.send_command(method, params))
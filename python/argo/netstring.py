@@ -2,16 +2,24 @@
 as a lightweight transport layer for JSON RPC.
 """
 
-from typing import Tuple
+from typing import Tuple, Union
 
-def encode(string : str) -> bytes:
-    """Encode a ``str`` into a netstring.
+class Incomplete(ValueError):
+    """Raised when a bytestring ends before the netstring at its start does.
+    More of the netstring may still arrive, unlike when it is malformed."""
+    pass
+
+def encode(string : Union[str, bytes]) -> bytes:
+    """Encode a ``str`` or an already UTF-8 encoded ``bytes`` into a
+    netstring.
 
     >>> encode("hello")
     b'5:hello,'
+    >>> encode(b"hello")
+    b'5:hello,'
     """
-    bytestring = string.encode()
-    return str(len(bytestring)).encode() + b':' + bytestring + b','
+    bytestring = string.encode() if isinstance(string, str) else string
+    return b'%d:%s,' % (len(bytestring), bytestring)
 
 def decode(netstring : bytes) -> Tuple[str, bytes]:
     """Decode the first valid netstring from a bytestring, returning its
@@ -22,20 +30,33 @@ def decode(netstring : bytes) -> Tuple[str, bytes]:
 
     """
 
-    i = 0
-    length_bytes = bytearray(b'')
-    while chr(netstring[i]).isdigit():
-        length_bytes.append(netstring[i])
-        i += 1
-    if chr(netstring[i]).encode() != b':':
+    (contents, end) = decode_at(netstring, 0)
+    return (contents.decode(), netstring[end:])
+
+def decode_at(netstring : Union[bytes, bytearray], pos : int) -> Tuple[bytes, int]:
+    """Decode the netstring that starts at index ``pos`` of a bytestring,
+    returning its contents and the index just past its end. Unlike
+    :func:`decode`, this does not copy the remainder of the bytestring.
+    Raises :class:`Incomplete` if the bytestring ends too early, and
+    ``ValueError`` if the netstring is malformed.
+
+    >>> decode_at(b'5:hello,2:hi,', 8)
+    (b'hi', 13)
+
+    """
+
+    colon = netstring.find(b':', pos)
+    if colon < 0:
+        if netstring[pos:].isdigit() or pos == len(netstring):
+            raise Incomplete("Incomplete netstring")
+        raise ValueError("Malformed netstring, missing :")
+    length_bytes = netstring[pos:colon]
+    if not length_bytes.isdigit():
         raise ValueError("Malformed netstring, missing :")
-    length = int(length_bytes.decode())
-    i += 1
-    out = bytearray(b'')
-    for j in range(0, length):
-        out.append(netstring[i])
-        i += 1
-    if chr(netstring[i]).encode() != b',':
+    start = colon + 1
+    end = start + int(length_bytes)
+    if end >= len(netstring):
+        raise Incomplete("Incomplete netstring")
+    if netstring[end] != ord(','):
         raise ValueError("Malformed netstring, missing ,")
-    i += 1
-    return (out.decode(), netstring[i:])
+    return (memoryview(netstring)[start:end].tobytes(), end + 1)
@@ -0,0 +1,2 @@
+# import the package
+import argo.netstring
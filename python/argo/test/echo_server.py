@@ -0,0 +1,53 @@
+"""A tiny stand-in for an Argo socket server, which answers each request
+with its own parameters. Run with ``port`` to listen on TCP and announce
+``PORT <n>``, or with ``socket`` to listen on a Unix domain socket and
+announce ``SOCKET <path>``."""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+
+def serve(conn: socket.socket) -> None:
+    buf = b''
+    while True:
+        data = conn.recv(4096)
+        if not data:
+            return
+        buf += data
+        while b':' in buf:
+            (length, rest) = buf.split(b':', 1)
+            if len(rest) <= int(length):
+                break
+            (message, buf) = (rest[:int(length)], rest[int(length) + 1:])
+            request = json.loads(message)
+            answer = json.dumps({'jsonrpc': '2.0',
+                                 'id': request['id'],
+                                 'result': request['params']}).encode()
+            conn.sendall(b'%d:%s,' % (len(answer), answer))
+
+
+def main() -> None:
+    if sys.argv[1] == 'socket':
+        path = os.path.join(tempfile.mkdtemp(), 'argo.sock')
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        announcement = 'SOCKET ' + path
+    else:
+        listener = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listener.bind(('::1', 0))
+        announcement = 'PORT %d' % listener.getsockname()[1]
+    listener.listen(1)
+    print(announcement, flush=True)
+    (conn, _) = listener.accept()
+    with conn:
+        serve(conn)
+    if sys.argv[1] == 'socket':
+        os.unlink(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import unittest
+from typing import Any, Awaitable, Callable, List
+from argo import connection, netstring
+
+
+async def with_server(handle: Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]],
+                      client: Callable[[connection.AsyncServerConnection], Awaitable[Any]]) -> Any:
+    """Run ``client`` against a connection to a local server that handles
+    its one connection with ``handle``."""
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    conn = await connection.AsyncServerConnection.open('127.0.0.1', port)
+    try:
+        return await client(conn)
+    finally:
+        await conn.close()
+        server.close()
+        await server.wait_closed()
+
+
+async def read_requests(reader: asyncio.StreamReader, count: int) -> List[Any]:
+    requests = []
+    for _ in range(count):
+        length = int((await reader.readuntil(b':'))[:-1])
+        requests.append(json.loads((await reader.readexactly(length + 1))[:-1]))
+    return requests
+
+
+def reply(request: Any) -> bytes:
+    return netstring.encode(json.dumps({'jsonrpc': '2.0',
+                                        'id': request['id'],
+                                        'result': request['params']}))
+
+
+class AsyncServerConnectionTests(unittest.TestCase):
+
+    def test_replies_out_of_order(self):
+        async def handle(reader, writer):
+            requests = await read_requests(reader, 3)
+            for request in reversed(requests):
+                writer.write(reply(request))
+            await writer.drain()
+            await reader.read()
+            writer.close()
+
+        async def client(conn):
+            return await asyncio.gather(*[conn.call('echo', {'n': n}) for n in range(3)])
+
+        replies = asyncio.run(with_server(handle, client))
+        self.assertEqual([r['result'] for r in replies], [{'n': 0}, {'n': 1}, {'n': 2}])
+
+    def test_eof_fails_pending_requests(self):
+        async def handle(reader, writer):
+            requests = await read_requests(reader, 2)
+            writer.write(reply(requests[0]))
+            await writer.drain()
+            writer.close()
+
+        async def client(conn):
+            first = await conn.send_command('echo', {'n': 0})
+            second = await conn.send_command('echo', {'n': 1})
+            self.assertEqual((await conn.wait_for_reply_to(first))['result'], {'n': 0})
+            with self.assertRaises(ConnectionError):
+                await conn.wait_for_reply_to(second)
+            with self.assertRaises(ConnectionError):
+                await conn.call('echo', {'n': 2})
+
+        asyncio.run(with_server(handle, client))
+
+    def test_close_fails_waiters(self):
+        async def handle(reader, writer):
+            await reader.read()
+            writer.close()
+
+        async def client(conn):
+            waiter = asyncio.ensure_future(conn.call('echo', {}))
+            await asyncio.sleep(0.01)
+            await conn.close()
+            with self.assertRaises(ConnectionError):
+                await asyncio.wait_for(waiter, 1)
+
+        asyncio.run(with_server(handle, client))
@@ -0,0 +1,178 @@
+import os
+import resource
+import socket
+import sys
+import unittest
+from typing import List, Optional
+from argo import connection, netstring
+
+
+class RecordingProcess(connection.ServerProcess):
+    """A process that records the writes made to it and answers every
+    request with an empty result."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: List[List[bytes]] = []
+        self.pending: List[bytes] = []
+
+    def setup(self) -> None:
+        pass
+
+    def get_one_reply(self) -> Optional[bytes]:
+        return self.pending.pop(0) if self.pending else None
+
+    def wait_for_one_reply(self) -> bytes:
+        reply = self.get_one_reply()
+        if reply is None:
+            raise ConnectionError("No reply will arrive")
+        return reply
+
+    def send_one_message(self, message, *, expecting_response=True) -> None:
+        self.send_messages([message])
+
+    def send_messages(self, messages) -> None:
+        self.writes.append(list(messages))
+        for message in messages:
+            request_id = connection._json_loads(message)['id']
+            self.pending.append(b'{"jsonrpc":"2.0","id":%d,"result":{}}' % request_id)
+
+
+class JSONTests(unittest.TestCase):
+
+    def test_loads_integers_beyond_64_bits(self):
+        for n in [2**63 - 1, 2**63, 2**64 - 1, 2**64, -2**63, -2**63 - 1,
+                  -9999999999999999999, 10**30, -10**30]:
+            decoded = connection._json_loads(b'{"a": %d}' % n)['a']
+            self.assertIsInstance(decoded, int)
+            self.assertEqual(decoded, n)
+
+    def test_dumps_integers_beyond_64_bits(self):
+        for n in [2**64, -2**63 - 1, 10**30]:
+            self.assertEqual(connection._json_loads(connection._json_dumps([n])), [n])
+
+
+class ReplyIDTests(unittest.TestCase):
+
+    def test_id_first_is_left_unparsed(self):
+        reply = b'{"jsonrpc":"2.0","id":7,"result":{"id":3}}'
+        self.assertEqual(connection._split_reply(reply), (7, reply))
+
+    def test_id_after_nested_id(self):
+        reply = b'{"jsonrpc":"2.0","result":{"answer":{"id":3},"id":4},"id":7}'
+        (reply_id, parsed) = connection._split_reply(reply)
+        self.assertEqual(reply_id, 7)
+        self.assertEqual(parsed['result'], {'answer': {'id': 3}, 'id': 4})
+
+    def test_replies_filed_under_top_level_id(self):
+        conn = connection.ServerConnection(RecordingProcess())
+        conn._add_reply(b'{"result":{"id":1},"jsonrpc":"2.0","id":2}')
+        conn._add_reply(b'{"jsonrpc":"2.0","id":1,"result":{"id":2}}')
+        self.assertEqual(conn.wait_for_reply_to(2)['result'], {'id': 1})
+        self.assertEqual(conn.wait_for_reply_to(1)['result'], {'id': 2})
+
+
+class QueuedServerConnectionTests(unittest.TestCase):
+
+    def test_queued_commands_are_sent_together(self):
+        proc = RecordingProcess()
+        conn = connection.ServerConnection(proc)
+        queue = connection.QueuedServerConnection(conn)
+        ids = [queue.send_command('m', {'n': n}) for n in range(3)]
+        other = conn.send_command('m', {})
+        self.assertEqual(len(proc.writes), 1)
+        queue.flush()
+        self.assertEqual(len(proc.writes), 2)
+        self.assertEqual(len(proc.writes[1]), 3)
+        for request_id in ids + [other]:
+            self.assertEqual(conn.wait_for_reply_to(request_id)['id'], request_id)
+        self.assertEqual(len(set(ids + [other])), 4)
+
+    def test_waiting_sends_queued_commands(self):
+        proc = RecordingProcess()
+        queue = connection.QueuedServerConnection(connection.ServerConnection(proc))
+        first = queue.send_command('m', {})
+        self.assertEqual(queue.wait_for_reply_to(first)['result'], {})
+        self.assertEqual(len(proc.writes), 1)
+        queue.send_command('m', {})
+        queue.send_command('m', {})
+        self.assertEqual(len(proc.writes), 1)
+        queue.flush()
+        self.assertEqual(len(proc.writes[1]), 2)
+
+    def test_discard(self):
+        proc = RecordingProcess()
+        queue = connection.QueuedServerConnection(connection.ServerConnection(proc))
+        queue.send_command('m', {})
+        queue.discard()
+        queue.flush()
+        self.assertEqual(proc.writes, [])
+
+
+class SocketPairProcess(connection.BufferedSocketProcess):
+    """A process that talks to the other end of a local socket pair."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.socket = sock
+        super().__init__()
+
+    def setup(self) -> None:
+        pass
+
+
+class BufferedSocketTests(unittest.TestCase):
+
+    def test_replies_split_across_reads(self):
+        (ours, theirs) = socket.socketpair()
+        with ours, theirs:
+            proc = SocketPairProcess(ours)
+            self.assertIsNone(proc.get_one_reply())
+            self.assertTrue(ours.getblocking())
+            data = netstring.encode(b'hello') + netstring.encode(b'world')
+            theirs.sendall(data[:3])
+            self.assertIsNone(proc.get_one_reply())
+            theirs.sendall(data[3:])
+            self.assertEqual(proc.get_one_reply(), b'hello')
+            self.assertEqual(proc.wait_for_one_reply(), b'world')
+            self.assertIsNone(proc.get_one_reply())
+            theirs.close()
+            with self.assertRaises(ConnectionError):
+                proc.wait_for_one_reply()
+
+    def test_high_file_descriptor(self):
+        high_fd = 2000
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= high_fd:
+            self.skipTest("not allowed to open enough files")
+        (ours, theirs) = socket.socketpair()
+        with theirs:
+            os.dup2(ours.fileno(), high_fd)
+            ours.close()
+            with socket.socket(fileno=high_fd) as high:
+                proc = SocketPairProcess(high)
+                self.assertIsNone(proc.get_one_reply())
+                theirs.sendall(netstring.encode(b'hello'))
+                self.assertEqual(proc.wait_for_one_reply(), b'hello')
+
+
+class DynamicSocketProcessTests(unittest.TestCase):
+
+    def echo(self, mode: str) -> connection.DynamicSocketProcess:
+        server = os.path.join(os.path.dirname(__file__), 'echo_server.py')
+        proc = connection.DynamicSocketProcess([sys.executable, server, mode])
+        self.addCleanup(proc.proc.wait, 10)
+        self.addCleanup(proc.socket.close)
+        conn = connection.ServerConnection(proc)
+        ids = conn.send_commands([('echo', {'n': n}) for n in range(3)])
+        self.assertEqual([conn.wait_for_reply_to(i)['result'] for i in ids],
+                         [{'n': 0}, {'n': 1}, {'n': 2}])
+        return proc
+
+    def test_port(self):
+        proc = self.echo('port')
+        self.assertIsInstance(proc.port, int)
+        self.assertIsNone(proc.socket_path)
+
+    def test_socket(self):
+        proc = self.echo('socket')
+        self.assertIsNone(proc.port)
+        self.assertTrue(proc.socket_path.endswith('argo.sock'))
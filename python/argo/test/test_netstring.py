@@ -0,0 +1,42 @@
+import unittest
+from argo import netstring
+
+
+class NetstringTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        for s in ['', 'hello', 'a:b,c', '{"id": 1}', 'λ' * 1000]:
+            self.assertEqual(netstring.decode(netstring.encode(s)), (s, b''))
+
+    def test_decode_leaves_rest(self):
+        self.assertEqual(netstring.decode(b'5:hello,5:world,'), ('hello', b'5:world,'))
+        self.assertEqual(netstring.decode(bytearray(b'0:,x')), ('', bytearray(b'x')))
+
+    def test_decode_incomplete(self):
+        for partial in [b'', b'12', b'5:', b'5:hel', b'5:hello']:
+            with self.assertRaises(netstring.Incomplete):
+                netstring.decode(partial)
+
+    def test_decode_malformed(self):
+        for bad in [b'x:hello,', b'-5:hello,', b' 5:hello,', b'5:hello;', b':', b'12x']:
+            with self.assertRaises(ValueError) as cm:
+                netstring.decode(bad)
+            self.assertNotIsInstance(cm.exception, netstring.Incomplete)
+
+    def test_decode_at(self):
+        buf = bytearray(b'5:hello,0:,5:world,3:')
+        (msg, pos) = netstring.decode_at(buf, 0)
+        self.assertEqual((msg, pos), (b'hello', 8))
+        (msg, pos) = netstring.decode_at(buf, pos)
+        self.assertEqual((msg, pos), (b'', 11))
+        (msg, pos) = netstring.decode_at(buf, pos)
+        self.assertEqual((msg, pos), (b'world', 19))
+        with self.assertRaises(ValueError):
+            netstring.decode_at(buf, pos)
+        # The buffer must still be resizable after decoding from it
+        del buf[:pos]
+        self.assertEqual(buf, bytearray(b'3:'))
+
+
+if __name__ == "__main__":
+    unittest.main()
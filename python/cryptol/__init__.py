@@ -6,7 +6,7 @@ import base64
 import os
 import types
 import sys
-from typing import Any, Dict, Iterable, List, Mapping, NoReturn, Optional, Type, Union
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NoReturn, Optional, Type, Union
 from mypy_extensions import TypedDict
 
 import argo.interaction
@@ -48,35 +48,52 @@ def from_cryptol_arg(val : Any) -> Any:
         return val
     elif isinstance(val, int):
         return val
-    elif 'expression' in val.keys():
+    elif isinstance(val, dict) and 'expression' in val:
         tag = val['expression']
-        if tag == 'unit':
-            return ()
-        elif tag == 'tuple':
-            return tuple(from_cryptol_arg(x) for x in val['data'])
-        elif tag == 'record':
-            return {k : from_cryptol_arg(val[k]) for k in val['data']}
-        elif tag == 'sequence':
-            return [from_cryptol_arg(v) for v in val['data']]
-        elif tag == 'bits':
-            enc = val['encoding']
-            size = val['width']
-            if enc == 'base64':
-                n = int.from_bytes(
-                        base64.b64decode(val['data'].encode('ascii')),
-                        byteorder='big')
-            elif enc == 'hex':
-                n = int.from_bytes(
-                    bytes.fromhex(extend_hex(val['data'])),
-                    byteorder='big')
-            else:
-                raise ValueError("Unknown encoding " + str(enc))
-            return BV(size, n)
-        else:
+        convert = _from_cryptol_expressions.get(tag)
+        if convert is None:
             raise ValueError("Unknown expression tag " + tag)
+        return convert(val)
     else:
         raise TypeError("Unsupported value " + str(val))
 
+def _from_cryptol_unit(val : Any) -> Any:
+    return ()
+
+def _from_cryptol_tuple(val : Any) -> Any:
+    return tuple([from_cryptol_arg(x) for x in val['data']])
+
+def _from_cryptol_record(val : Any) -> Any:
+    fields = val['data']
+    return {k : from_cryptol_arg(fields[k]) for k in fields}
+
+def _from_cryptol_sequence(val : Any) -> Any:
+    return [from_cryptol_arg(v) for v in val['data']]
+
+def _from_cryptol_bits(val : Any) -> Any:
+    enc = val['encoding']
+    size = val['width']
+    if enc == 'base64':
+        n = int.from_bytes(
+                base64.b64decode(val['data'].encode('ascii')),
+                byteorder='big')
+    elif enc == 'hex':
+        n = int.from_bytes(
+            bytes.fromhex(extend_hex(val['data'])),
+            byteorder='big')
+    else:
+        raise ValueError("Unknown encoding " + str(enc))
+    return BV(size, n)
+
+# How from_cryptol_arg decodes each kind of Cryptol JSON expression
+_from_cryptol_expressions : Dict[str, Callable[[Any], Any]] = {
+    'unit': _from_cryptol_unit,
+    'tuple': _from_cryptol_tuple,
+    'record': _from_cryptol_record,
+    'sequence': _from_cryptol_sequence,
+    'bits': _from_cryptol_bits,
+}
+
 
 
 class CryptolChangeDirectory(argo.interaction.Command):
@@ -358,13 +375,17 @@ class CryptolStdIOProcess(StdIOProcess):
 
 
 class CryptolFunctionHandle:
+    __slots__ = ('connection', 'name', 'ty', 'schema', 'docs', '__doc__')
+
     def __init__(self,
                  connection : CryptolConnection,
                  name : str,
                  ty : Any,
                  schema : Any,
                  docs : Optional[str] = None) -> None:
-        self.connection = connection.snapshot()
+        # Handles only issue queries, which leave the protocol state alone,
+        # so they can all share the caller's connection
+        self.connection = connection
         self.name = name
         self.ty = ty
         self.schema = schema
@@ -403,20 +424,14 @@ class CryptolModule(types.ModuleType):
             raise ValueError("Provided connection is not in a module")
         super(CryptolModule, self).__init__(name["module"])
 
+        handles = self.connection.snapshot()
         for x in self.connection.names().result():
-            if 'documentation' in x:
-                setattr(self, x['name'],
-                        CryptolFunctionHandle(self.connection,
-                                              x['name'],
-                                              x['type string'],
-                                              cryptoltypes.to_schema(x['type']),
-                                              x['documentation']))
-            else:
-                setattr(self, x['name'],
-                        CryptolFunctionHandle(self.connection,
-                                              x['name'],
-                                              x['type string'],
-                                              cryptoltypes.to_schema(x['type'])))
+            setattr(self, x['name'],
+                    CryptolFunctionHandle(handles,
+                                          x['name'],
+                                          x['type string'],
+                                          cryptoltypes.to_schema(x['type']),
+                                          x.get('documentation')))
 
 
 def add_cryptol_module(name : str, connection : CryptolConnection) -> None:
@@ -432,20 +447,14 @@ class CryptolContext:
     def __init__(self, connection : CryptolConnection) -> None:
         self.connection = connection.snapshot()
         self._defined = {}
+        handles = self.connection.snapshot()
         for x in self.connection.names().result():
-            if 'documentation' in x:
-                self._defined[x['name']] = \
-                    CryptolFunctionHandle(self.connection,
-                                          x['name'],
-                                          x['type string'],
-                                          cryptoltypes.to_schema(x['type']),
-                                          x['documentation'])
-            else:
-                self._defined[x['name']] = \
-                    CryptolFunctionHandle(self.connection,
-                                          x['name'],
-                                          x['type string'],
-                                          cryptoltypes.to_schema(x['type']))
+            self._defined[x['name']] = \
+                CryptolFunctionHandle(handles,
+                                      x['name'],
+                                      x['type string'],
+                                      cryptoltypes.to_schema(x['type']),
+                                      x.get('documentation'))
 
     def __dir__(self) -> Iterable[str]:
         return self._defined.keys()
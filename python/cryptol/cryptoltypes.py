@@ -1,12 +1,11 @@
 from __future__ import annotations
-from collections import OrderedDict
 from abc import ABCMeta, abstractmethod
-import base64
+from binascii import b2a_base64
 from math import ceil
 import BitVector #type: ignore
 from cryptol.bitvector import BV
 
-from typing import Any, Dict, Iterable, List, NoReturn, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, Iterable, List, NoReturn, Optional, TypeVar, Union
 
 from typing_extensions import Literal, Protocol
 
@@ -41,6 +40,8 @@ class CryptolApplication(CryptolCode):
                 'arguments': [to_cryptol(arg) for arg in self._rands]}
 
 class CryptolArrowKind:
+    __slots__ = ('domain', 'range')
+
     def __init__(self, dom : CryptolKind, ran : CryptolKind):
         self.domain = dom
         self.range = ran
@@ -55,38 +56,52 @@ def to_kind(k : Any) -> CryptolKind:
     elif k == "Num": return "Num"
     elif k == "Prop": return "Prop"
     elif k['kind'] == "arrow":
-        return CryptolArrowKind(k['from'], k['to'])
+        return CryptolArrowKind(to_kind(k['from']), to_kind(k['to']))
     else:
         raise ValueError(f'Not a Cryptol kind: {k!r}')
 
 class CryptolProp:
-    pass
+    __slots__ = ()
 
 class UnaryProp(CryptolProp):
+    __slots__ = ('subject',)
+
     def __init__(self, subject : CryptolType) -> None:
         self.subject = subject
 
 class Fin(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Fin({self.subject!r})"
 
 class Cmp(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Cmp({self.subject!r})"
 
 class SignedCmp(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"SignedCmp({self.subject!r})"
 
 class Zero(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Zero({self.subject!r})"
 
 class Arith(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Arith({self.subject!r})"
 
 class Logic(UnaryProp):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Logic({self.subject!r})"
 
@@ -94,9 +109,28 @@ class Logic(UnaryProp):
 def to_cryptol(val : Any, cryptol_type : Optional[CryptolType] = None) -> Any:
     if cryptol_type is not None:
         return cryptol_type.from_python(val)
+    t = type(val)
+    if t is int or t is bool:
+        # The most common leaves of a value, which need no conversion
+        return val
     else:
         return CryptolType().from_python(val)
 
+class PreEncoded:
+    """A Python value together with its Cryptol JSON representation, which
+    is computed once, when the ``PreEncoded`` is created. Passing it in
+    place of the value skips the conversion, which pays off when the same
+    large value is sent to the server many times.
+    """
+    __slots__ = ('value', 'encoded')
+
+    def __init__(self, val : Any, cryptol_type : Optional[CryptolType] = None) -> None:
+        self.value = val
+        self.encoded = to_cryptol(val, cryptol_type)
+
+    def __repr__(self) -> str:
+        return f"PreEncoded({self.value!r})"
+
 def fail_with(exn : Exception) -> NoReturn:
     raise exn
 
@@ -113,8 +147,12 @@ def is_plausible_json(val : Any) -> bool:
     return False
 
 class CryptolType:
+    __slots__ = ()
+
     def from_python(self, val : Any) -> Any:
-        if hasattr(val, '__to_cryptol__'):
+        if isinstance(val, PreEncoded):
+            return val.encoded
+        elif hasattr(val, '__to_cryptol__'):
             code = val.__to_cryptol__(self)
             if is_plausible_json(code):
                 return code
@@ -128,45 +166,76 @@ class CryptolType:
             return self.convert(val)
 
     def convert(self, val : Any) -> Any:
-        if isinstance(val, bool):
-            return val
-        elif isinstance(val, tuple) and val == ():
-            return {'expression': 'unit'}
-        elif isinstance(val, tuple):
-            return {'expression': 'tuple',
-                    'data': [to_cryptol(x) for x in val]}
-        elif isinstance(val, dict):
-            return {'expression': 'record',
-                    'data': {k : to_cryptol(val[k])
-                             if isinstance(k, str)
-                             else fail_with (TypeError("Record keys must be strings"))
-                             for k in val}}
-        elif isinstance(val, int):
-            return val
-        elif isinstance(val, list):
-            return {'expression': 'sequence',
-                    'data': [to_cryptol(v) for v in val]}
-        elif isinstance(val, bytes) or isinstance(val, bytearray):
-            return {'expression': 'bits',
-                    'encoding': 'base64',
-                    'width': 8 * len(val),
-                    'data': base64.b64encode(val).decode('ascii')}
-        elif isinstance(val, BitVector.BitVector):
-            n = int(val)
-            byte_width = ceil(n.bit_length()/8)
-            return {'expression': 'bits',
-                    'encoding': 'base64',
-                    'width': val.length(), # N.B. original length, not padded
-                    'data': base64.b64encode(n.to_bytes(byte_width,'big')).decode('ascii')}
-        elif isinstance(val, BV):
-            return {'expression': 'bits',
-                    'encoding': 'hex',
-                    'width': val.size(), # N.B. original length, not padded
-                    'data': val.hex()[2:]}
-        else:
-            raise TypeError("Unsupported value: " + str(val))
+        converter = _python_converters.get(type(val))
+        if converter is None:
+            # Instances of subclasses of the supported types are not found by
+            # the lookup above, so search for them instead.
+            for ty, conv in _python_converters.items():
+                if isinstance(val, ty):
+                    converter = conv
+                    break
+            else:
+                raise TypeError("Unsupported value: " + str(val))
+        return converter(val)
+
+def _convert_scalar(val : Any) -> Any:
+    return val
+
+def _convert_tuple(val : tuple) -> Any:
+    if not val:
+        return {'expression': 'unit'}
+    else:
+        return {'expression': 'tuple',
+                'data': [to_cryptol(x) for x in val]}
+
+def _convert_record(val : dict) -> Any:
+    return {'expression': 'record',
+            'data': {k : to_cryptol(val[k])
+                     if isinstance(k, str)
+                     else fail_with (TypeError("Record keys must be strings"))
+                     for k in val}}
+
+def _convert_sequence(val : list) -> Any:
+    return {'expression': 'sequence',
+            'data': [to_cryptol(v) for v in val]}
+
+def _convert_bytes(val : Union[bytes, bytearray]) -> Any:
+    return {'expression': 'bits',
+            'encoding': 'base64',
+            'width': 8 * len(val),
+            'data': b2a_base64(val, newline=False).decode('ascii')}
+
+def _convert_bitvector(val : BitVector.BitVector) -> Any:
+    n = int(val)
+    byte_width = ceil(n.bit_length()/8)
+    return {'expression': 'bits',
+            'encoding': 'base64',
+            'width': val.length(), # N.B. original length, not padded
+            'data': b2a_base64(n.to_bytes(byte_width,'big'), newline=False).decode('ascii')}
+
+def _convert_bv(val : BV) -> Any:
+    return {'expression': 'bits',
+            'encoding': 'hex',
+            'width': val.size(), # N.B. original length, not padded
+            'data': val.hex()[2:]}
+
+# How CryptolType.convert encodes each supported Python type, in the order in
+# which they are tried for values whose type is not a key.
+_python_converters : Dict[type, Callable[[Any], Any]] = {
+    bool: _convert_scalar,
+    tuple: _convert_tuple,
+    dict: _convert_record,
+    int: _convert_scalar,
+    list: _convert_sequence,
+    bytes: _convert_bytes,
+    bytearray: _convert_bytes,
+    BitVector.BitVector: _convert_bitvector,
+    BV: _convert_bv,
+}
 
 class Var(CryptolType):
+    __slots__ = ('name', 'kind')
+
     def __init__(self, name : str, kind : CryptolKind) -> None:
         self.name = name
         self.kind = kind
@@ -177,6 +246,8 @@ class Var(CryptolType):
 
 
 class Function(CryptolType):
+    __slots__ = ('domain', 'range')
+
     def __init__(self, dom : CryptolType, ran : CryptolType) -> None:
         self.domain = dom
         self.range = ran
@@ -185,6 +256,8 @@ class Function(CryptolType):
         return f"Function({self.domain!r}, {self.range!r})"
 
 class Bitvector(CryptolType):
+    __slots__ = ('width',)
+
     def __init__(self, width : CryptolType) -> None:
         self.width = width
 
@@ -203,7 +276,7 @@ class Bitvector(CryptolType):
             return {'expression': 'bits',
                     'encoding': 'base64',
                     'width': eval_numeric(self.width, 8 * len(val)),
-                    'data': base64.b64encode(val).decode('ascii')}
+                    'data': b2a_base64(val, newline=False).decode('ascii')}
         elif isinstance(val, BitVector.BitVector):
             return CryptolType.convert(self, val)
         elif isinstance(val, BV):
@@ -219,6 +292,8 @@ def eval_numeric(t : Any, default : A) -> Union[int, A]:
 
 
 class Num(CryptolType):
+    __slots__ = ('number',)
+
     def __init__(self, number : int) -> None:
         self.number = number
 
@@ -226,6 +301,8 @@ class Num(CryptolType):
         return f"Num({self.number!r})"
 
 class Bit(CryptolType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         pass
 
@@ -233,6 +310,8 @@ class Bit(CryptolType):
         return f"Bit()"
 
 class Sequence(CryptolType):
+    __slots__ = ('length', 'contents')
+
     def __init__(self, length : CryptolType, contents : CryptolType) -> None:
         self.length = length
         self.contents = contents
@@ -241,18 +320,26 @@ class Sequence(CryptolType):
         return f"Sequence({self.length!r}, {self.contents!r})"
 
 class Inf(CryptolType):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Inf()"
 
 class Integer(CryptolType):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Integer()"
 
 class Rational(CryptolType):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"Rational()"
 
 class Z(CryptolType):
+    __slots__ = ('modulus',)
+
     def __init__(self, modulus : CryptolType) -> None:
         self.modulus = modulus
 
@@ -261,6 +348,8 @@ class Z(CryptolType):
 
 
 class Plus(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -272,6 +361,8 @@ class Plus(CryptolType):
         return f"Plus({self.left!r}, {self.right!r})"
 
 class Minus(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -283,6 +374,8 @@ class Minus(CryptolType):
         return f"Minus({self.left!r}, {self.right!r})"
 
 class Times(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -295,6 +388,8 @@ class Times(CryptolType):
 
 
 class Div(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -306,6 +401,8 @@ class Div(CryptolType):
         return f"Div({self.left!r}, {self.right!r})"
 
 class CeilDiv(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -317,6 +414,8 @@ class CeilDiv(CryptolType):
         return f"CeilDiv({self.left!r}, {self.right!r})"
 
 class Mod(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -328,6 +427,8 @@ class Mod(CryptolType):
         return f"Mod({self.left!r}, {self.right!r})"
 
 class CeilMod(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -339,6 +440,8 @@ class CeilMod(CryptolType):
         return f"CeilMod({self.left!r}, {self.right!r})"
 
 class Expt(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -350,6 +453,8 @@ class Expt(CryptolType):
         return f"Expt({self.left!r}, {self.right!r})"
 
 class Log2(CryptolType):
+    __slots__ = ('operand',)
+
     def __init__(self, operand : CryptolType) -> None:
         self.operand = operand
 
@@ -360,6 +465,8 @@ class Log2(CryptolType):
         return f"Log2({self.operand!r})"
 
 class Width(CryptolType):
+    __slots__ = ('operand',)
+
     def __init__(self, operand : CryptolType) -> None:
         self.operand = operand
 
@@ -370,6 +477,8 @@ class Width(CryptolType):
         return f"Width({self.operand!r})"
 
 class Max(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -381,6 +490,8 @@ class Max(CryptolType):
         return f"Max({self.left!r}, {self.right!r})"
 
 class Min(CryptolType):
+    __slots__ = ('left', 'right')
+
     def __init__(self, left : CryptolType, right : CryptolType) -> None:
         self.left = left
         self.right = right
@@ -392,6 +503,8 @@ class Min(CryptolType):
         return f"Min({self.left!r}, {self.right!r})"
 
 class Tuple(CryptolType):
+    __slots__ = ('types',)
+
     types : Iterable[CryptolType]
 
     def __init__(self, *types : CryptolType) -> None:
@@ -401,6 +514,8 @@ class Tuple(CryptolType):
         return "Tuple(" + ", ".join(map(str, self.types)) + ")"
 
 class Record(CryptolType):
+    __slots__ = ('fields',)
+
     def __init__(self, fields : Dict[str, CryptolType]) -> None:
         self.fields = fields
 
@@ -408,60 +523,47 @@ class Record(CryptolType):
         return f"Record({self.fields!r})"
 
 def to_type(t : Any) -> CryptolType:
-    if t['type'] == 'variable':
-        return Var(t['name'], to_kind(t['kind']))
-    elif t['type'] == 'function':
-        return Function(to_type(t['domain']), to_type(t['range']))
-    elif t['type'] == 'bitvector':
-        return Bitvector(to_type(t['width']))
-    elif t['type'] == 'number':
-        return Num(t['value'])
-    elif t['type'] == 'Bit':
-        return Bit()
-    elif t['type'] == 'sequence':
-        return Sequence(to_type(t['length']), to_type(t['contents']))
-    elif t['type'] == 'inf':
-        return Inf()
-    elif t['type'] == '+':
-        return Plus(*map(to_type, t['arguments']))
-    elif t['type'] == '-':
-        return Minus(*map(to_type, t['arguments']))
-    elif t['type'] == '*':
-        return Times(*map(to_type, t['arguments']))
-    elif t['type'] == '/':
-        return Div(*map(to_type, t['arguments']))
-    elif t['type'] == '/^':
-        return CeilDiv(*map(to_type, t['arguments']))
-    elif t['type'] == '%':
-        return Mod(*map(to_type, t['arguments']))
-    elif t['type'] == '%^':
-        return CeilMod(*map(to_type, t['arguments']))
-    elif t['type'] == '^^':
-        return Expt(*map(to_type, t['arguments']))
-    elif t['type'] == 'lg2':
-        return Log2(*map(to_type, t['arguments']))
-    elif t['type'] == 'width':
-        return Width(*map(to_type, t['arguments']))
-    elif t['type'] == 'max':
-        return Max(*map(to_type, t['arguments']))
-    elif t['type'] == 'min':
-        return Min(*map(to_type, t['arguments']))
-    elif t['type'] == 'tuple':
-        return Tuple(*map(to_type, t['contents']))
-    elif t['type'] == 'record':
-        return Record({k : to_type(t['fields'][k]) for k in t['fields']})
-    elif t['type'] == 'Integer':
-        return Integer()
-    elif t['type'] == 'Rational':
-        return Rational()
-    elif t['type'] == 'Z':
-        return Z(to_type(t['modulus']))
-    else:
+    constructor = _type_constructors.get(t['type'])
+    if constructor is None:
         raise NotImplementedError(f"to_type({t!r})")
+    return constructor(t)
+
+def _on_arguments(constructor : Callable[..., CryptolType]) -> Callable[[Any], CryptolType]:
+    return lambda t: constructor(*map(to_type, t['arguments']))
+
+# How to_type builds each kind of Cryptol JSON type
+_type_constructors : Dict[str, Callable[[Any], CryptolType]] = {
+    'variable': lambda t: Var(t['name'], to_kind(t['kind'])),
+    'function': lambda t: Function(to_type(t['domain']), to_type(t['range'])),
+    'bitvector': lambda t: Bitvector(to_type(t['width'])),
+    'number': lambda t: Num(t['value']),
+    'Bit': lambda t: Bit(),
+    'sequence': lambda t: Sequence(to_type(t['length']), to_type(t['contents'])),
+    'inf': lambda t: Inf(),
+    '+': _on_arguments(Plus),
+    '-': _on_arguments(Minus),
+    '*': _on_arguments(Times),
+    '/': _on_arguments(Div),
+    '/^': _on_arguments(CeilDiv),
+    '%': _on_arguments(Mod),
+    '%^': _on_arguments(CeilMod),
+    '^^': _on_arguments(Expt),
+    'lg2': _on_arguments(Log2),
+    'width': _on_arguments(Width),
+    'max': _on_arguments(Max),
+    'min': _on_arguments(Min),
+    'tuple': lambda t: Tuple(*map(to_type, t['contents'])),
+    'record': lambda t: Record({k : to_type(t['fields'][k]) for k in t['fields']}),
+    'Integer': lambda t: Integer(),
+    'Rational': lambda t: Rational(),
+    'Z': lambda t: Z(to_type(t['modulus'])),
+}
 
 class CryptolTypeSchema:
+    __slots__ = ('variables', 'propositions', 'body')
+
     def __init__(self,
-                 variables : OrderedDict[str, CryptolKind],
+                 variables : Dict[str, CryptolKind],
                  propositions : List[Optional[CryptolProp]], # TODO complete me!
                  body : CryptolType) -> None:
         self.variables = variables
@@ -472,27 +574,25 @@ class CryptolTypeSchema:
         return f"CryptolTypeSchema({self.variables!r}, {self.propositions!r}, {self.body!r})"
 
 def to_schema(obj : Any) -> CryptolTypeSchema:
-    return CryptolTypeSchema(OrderedDict((v['name'], to_kind(v['kind']))
-                                         for v in obj['forall']),
+    return CryptolTypeSchema({v['name']: to_kind(v['kind']) for v in obj['forall']},
                              [to_prop(p) for p in obj['propositions']],
                              to_type(obj['type']))
 
 def to_prop(obj : Any) -> Optional[CryptolProp]:
-    if obj['prop'] == 'fin':
-        return Fin(to_type(obj['subject']))
-    elif obj['prop'] == 'Cmp':
-        return Cmp(to_type(obj['subject']))
-    elif obj['prop'] == 'SignedCmp':
-        return SignedCmp(to_type(obj['subject']))
-    elif obj['prop'] == 'Zero':
-        return Zero(to_type(obj['subject']))
-    elif obj['prop'] == 'Arith':
-        return Arith(to_type(obj['subject']))
-    elif obj['prop'] == 'Logic':
-        return Logic(to_type(obj['subject']))
-    else:
+    prop = _unary_props.get(obj['prop'])
+    if prop is None:
         return None
         #raise ValueError(f"Can't convert to a Cryptol prop: {obj!r}")
+    return prop(to_type(obj['subject']))
+
+_unary_props : Dict[str, Callable[[CryptolType], CryptolProp]] = {
+    'fin': Fin,
+    'Cmp': Cmp,
+    'SignedCmp': SignedCmp,
+    'Zero': Zero,
+    'Arith': Arith,
+    'Logic': Logic,
+}
 
 def argument_types(obj : Union[CryptolTypeSchema, CryptolType]) -> List[CryptolType]:
     if isinstance(obj, CryptolTypeSchema):
@@ -0,0 +1,83 @@
+import unittest
+from cryptol import from_cryptol_arg
+from cryptol.bitvector import BV
+from cryptol.cryptoltypes import Bitvector, Num, PreEncoded, to_cryptol, to_schema
+from BitVector import BitVector
+
+
+class ValueConversionTests(unittest.TestCase):
+
+    def assertRoundTrip(self, val, expected=None):
+        self.assertEqual(from_cryptol_arg(to_cryptol(val)),
+                         val if expected is None else expected)
+
+    def test_scalars(self):
+        self.assertRoundTrip(True)
+        self.assertRoundTrip(42)
+        self.assertRoundTrip(2 ** 100)
+        self.assertRoundTrip(())
+
+    def test_bits(self):
+        self.assertRoundTrip(b'\x01\xff', BV(16, 0x01ff))
+        self.assertRoundTrip(bytearray(b'\x80'), BV(8, 0x80))
+        self.assertRoundTrip(BV(12, 0xabc))
+        self.assertRoundTrip(BitVector(intVal=5, size=8), BV(8, 5))
+
+    def test_nested(self):
+        self.assertRoundTrip((1, [True, False], {'x': (2, 3), 'y': []}))
+        self.assertRoundTrip({'a': {'b': [(1, ()), (2, ())]}})
+        self.assertIsInstance(from_cryptol_arg(to_cryptol((1, 2))), tuple)
+
+    def test_subclasses(self):
+        class MyList(list):
+            pass
+        self.assertRoundTrip(MyList([1, 2]), [1, 2])
+
+    def test_pre_encoded(self):
+        val = [b'\x00' * 64, (1, 2)]
+        pre = PreEncoded(val)
+        self.assertEqual(to_cryptol(pre), to_cryptol(val))
+        self.assertEqual(to_cryptol([pre, pre]), to_cryptol([val, val]))
+        self.assertIs(to_cryptol(pre), to_cryptol(pre))
+        self.assertEqual(to_cryptol(PreEncoded(5, Bitvector(Num(8)))),
+                         Bitvector(Num(8)).from_python(5))
+
+    def test_unsupported(self):
+        with self.assertRaises(TypeError):
+            to_cryptol(1.5)
+        with self.assertRaises(TypeError):
+            to_cryptol({1: 2})
+        with self.assertRaises(ValueError):
+            from_cryptol_arg({'expression': 'no such thing'})
+
+
+class SchemaTests(unittest.TestCase):
+
+    def test_to_schema(self):
+        n = {'type': 'variable', 'name': 'n', 'kind': 'Num'}
+        schema = to_schema({
+            'forall': [{'name': 'n', 'kind': 'Num'},
+                       {'name': 'f', 'kind': {'kind': 'arrow', 'from': 'Type', 'to': 'Type'}}],
+            'propositions': [{'prop': 'fin', 'subject': n},
+                             {'prop': 'unknown'}],
+            'type': {'type': 'function',
+                     'domain': {'type': 'bitvector',
+                                'width': {'type': '+', 'arguments': [n, {'type': 'number', 'value': 1}]}},
+                     'range': {'type': 'tuple',
+                               'contents': [{'type': 'Bit'},
+                                            {'type': 'record',
+                                             'fields': {'x': {'type': 'Z', 'modulus': {'type': 'inf'}}}}]}}})
+        self.assertEqual(list(schema.variables), ['n', 'f'])
+        self.assertEqual(repr(schema.variables['f']), "CryptolArrowKind('Type', 'Type')")
+        self.assertEqual(repr(schema.propositions), "[Fin(Var('n', 'Num')), None]")
+        self.assertEqual(repr(schema.body),
+                         "Function(Bitvector(Plus(Var('n', 'Num'), Num(1))), "
+                         "Tuple(Bit(), Record({'x': Z(Inf())})))")
+
+    def test_unknown_type(self):
+        with self.assertRaises(NotImplementedError):
+            to_schema({'forall': [], 'propositions': [], 'type': {'type': 'mystery'}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -51,6 +51,12 @@ class SAWConnection:
         else:
             return self.most_recent_result.state()
 
+    def batch(self) -> SAWBatch:
+        """Return a ``SAWBatch`` of verifications that all start from the
+        current state of this connection.
+        """
+        return SAWBatch(self)
+
     # Protocol messages
     def cryptol_load_file(self, filename: str) -> argo.interaction.Command:
         self.most_recent_result = CryptolLoadFile(self, filename)
@@ -80,3 +86,64 @@ class SAWConnection:
         self.most_recent_result = \
             LLVMAssume(self, module, function, contract, lemma_name)
         return self.most_recent_result
+
+
+class SAWBatch:
+    """A group of verifications that all start from the same state and are
+    sent to the server in a single write when the ``with`` block ends, so
+    that they do not each wait out a round trip before the next one is
+    sent. Waiting for the result of a verification inside the block sends
+    the ones queued so far. If the block raises an exception, those that
+    have not been sent yet are dropped. Other commands on the connection
+    are sent as usual.
+
+    The states that batched verifications produce are not kept, so they
+    establish no lemmas that later commands can use. Batches suit
+    verifications whose results are only checked, such as the last
+    functions in a proof that rely on lemmas established beforehand::
+
+        with conn.batch() as batch:
+            batch.llvm_verify(mod, 'f', lemmas, False, f_spec, script, 'f_ov')
+            batch.llvm_verify(mod, 'g', lemmas, False, g_spec, script, 'g_ov')
+        results = batch.results()
+    """
+
+    commands: List[argo.interaction.Command]
+    server_connection: ac.QueuedServerConnection
+
+    def __init__(self, connection: SAWConnection) -> None:
+        self.connection = connection
+        self.commands = []
+        self.server_connection = ac.QueuedServerConnection(connection.server_connection)
+
+    def __enter__(self) -> SAWBatch:
+        return self
+
+    def __exit__(self, exc_type: Any, *_exc: Any) -> None:
+        if exc_type is None:
+            self.server_connection.flush()
+        else:
+            self.server_connection.discard()
+            self.commands = []
+
+    def results(self) -> List[Any]:
+        """Wait for and return the results of all verifications in the
+        batch, in the order in which they were added.
+        """
+        return [command.result() for command in self.commands]
+
+    # Protocol messages
+    def llvm_verify(self,
+                    module: str,
+                    function: str,
+                    lemmas: List[str],
+                    check_sat: bool,
+                    contract: Any,
+                    script: Any,
+                    lemma_name: str) -> argo.interaction.Command:
+        start = SAWConnection(self.server_connection)
+        start.most_recent_result = self.connection.most_recent_result
+        command = start.llvm_verify(
+            module, function, lemmas, check_sat, contract, script, lemma_name)
+        self.commands.append(command)
+        return command
@@ -0,0 +1,78 @@
+import unittest
+from argo import connection
+from argo.test.test_connection import RecordingProcess
+from saw.connection import SAWConnection
+
+
+class SAWProcess(RecordingProcess):
+    """A process that answers every SAW command with a fresh state, named
+    after the request ID."""
+
+    def send_messages(self, messages) -> None:
+        self.writes.append(list(messages))
+        for message in messages:
+            request_id = connection._json_loads(message)['id']
+            self.pending.append(
+                b'{"jsonrpc":"2.0","id":%d,"result":'
+                b'{"answer":null,"state":"s%d","stdout":"","stderr":""}}'
+                % (request_id, request_id))
+
+
+def verify(batch, function):
+    return batch.llvm_verify('m', function, [], False, {}, {}, function + '_ov')
+
+
+class SAWBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.proc = SAWProcess()
+        self.conn = SAWConnection(connection.ServerConnection(self.proc))
+        self.conn.llvm_load_module('m', 'm.bc')
+
+    def sent_states(self, write):
+        return [connection._json_loads(m)['params']['state'] for m in write]
+
+    def test_verifications_sent_together(self):
+        with self.conn.batch() as batch:
+            verify(batch, 'f')
+            verify(batch, 'g')
+            self.assertEqual(len(self.proc.writes), 1)
+        self.assertEqual(len(self.proc.writes), 2)
+        self.assertEqual(self.sent_states(self.proc.writes[1]), ['s1', 's1'])
+        self.assertEqual(batch.results(), [None, None])
+
+    def test_connection_state_unchanged(self):
+        with self.conn.batch() as batch:
+            verify(batch, 'f')
+        self.conn.llvm_load_module('n', 'n.bc')
+        self.assertEqual(self.sent_states(self.proc.writes[-1]), ['s1'])
+
+    def test_exception_discards_commands(self):
+        with self.assertRaises(KeyError):
+            with self.conn.batch() as batch:
+                verify(batch, 'f')
+                raise KeyError('f')
+        self.assertEqual(batch.results(), [])
+        self.conn.llvm_load_module('n', 'n.bc')
+        self.assertEqual(len(self.proc.writes), 2)
+        self.assertEqual(self.sent_states(self.proc.writes[1]), ['s1'])
+
+    def test_exception_sends_other_commands(self):
+        with self.assertRaises(KeyError):
+            with self.conn.batch() as batch:
+                verify(batch, 'f')
+                self.conn.llvm_load_module('n', 'n.bc')
+                raise KeyError('f')
+        self.conn.llvm_load_module('o', 'o.bc')
+        self.assertEqual(self.sent_states(self.proc.writes[-1]), ['s3'])
+
+    def test_waiting_inside_batch(self):
+        with self.conn.batch() as batch:
+            first = verify(batch, 'f')
+            first.result()
+            verify(batch, 'g')
+            verify(batch, 'h')
+            self.assertEqual(len(self.proc.writes), 2)
+        self.assertEqual(len(self.proc.writes), 3)
+        self.assertEqual(self.sent_states(self.proc.writes[2]), ['s1', 's1'])
+        self.assertEqual(batch.results(), [None, None, None])